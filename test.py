@@ -4,7 +4,10 @@ Controls bot wheels (L, R) and servos (S1, S2) using PS5 DualSense controller
 Sends commands to ESP01 via MQTT for STM32 bot control
 
 Requirements:
-    pip install pydualsense paho-mqtt
+    pip install pydualsense "paho-mqtt>=1.6,<2"
+    (BotMqttClient relies on paho-mqtt 1.x internals and callback signatures;
+    force_stop needs wait_for_publish(timeout=...), added in 1.6)
+    pip install numba  (optional, compiles the stick math to native code)
 
 PS5 Controller Mapping:
     Left Stick Y-axis: Forward/Backward (L & R motors)
@@ -22,14 +25,30 @@ import time
 import json
 import logging
 from pydualsense import pydualsense
+import paho.mqtt as mqtt_package
 import paho.mqtt.client as mqtt
 import sys
 import os
+import math
+import threading
+import socket
+import struct
+import uuid
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: keep the plain Python function"""
+        return lambda func: func
 
 # ===== CONFIGURATION =====
 MQTT_BROKER = "broker.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = "LDrago_windows/ducky_script"
+# Stable across restarts on this machine, unique across machines sharing the public broker
+MQTT_CLIENT_ID = os.getenv("MQTT_CLIENT_ID", f"PS5_BotController_{uuid.getnode():012x}")
+MQTT_KEEPALIVE = 60  # Seconds
 BOT_PASSWORD = os.getenv("BOT_PASSWORD", "E1s2t3e4r5")  # Change to your password
 
 # Servo limits (from main.cpp logic)
@@ -38,6 +57,16 @@ S1_MAX = 160  # Head tilt maximum
 S2_MIN = 0    # Head up/down minimum
 S2_MAX = 110  # Head up/down maximum
 
+# S1 step for each (L1, R1, D-pad left, D-pad right) bitmask, first pressed button wins
+S1_STEPS = (-5, 5, -10, 10)
+S1_DELTA_TABLE = tuple(
+    next((step for bit, step in enumerate(S1_STEPS) if mask >> bit & 1), 0)
+    for mask in range(1 << len(S1_STEPS))
+)
+# Held tilt buttons repeat their S1 step at this rate (Hz), however often the controller is sampled
+S1_REPEAT_RATE = 100
+S1_REPEAT_INTERVAL_NS = int(1e9 / S1_REPEAT_RATE)
+
 # Motor speed limits
 MOTOR_MIN = 0
 MOTOR_MAX = 255
@@ -49,10 +78,37 @@ MODE_SLOW = 0.5
 
 # Dead zones (ignore small stick movements)
 STICK_DEADZONE = 0.15
+SERVO_DEADZONE = 0.1
+# Precomputed 1 / (1 - deadzone) to rescale the range outside each deadzone
+STICK_DEADZONE_SCALE = 1.0 / (1.0 - STICK_DEADZONE)
+SERVO_DEADZONE_SCALE = 1.0 / (1.0 - SERVO_DEADZONE)
 
 # Update rate (Hz)
 UPDATE_RATE = 20  # 20 updates per second
 UPDATE_INTERVAL = 1.0 / UPDATE_RATE
+UPDATE_INTERVAL_NS = int(UPDATE_INTERVAL * 1e9)
+
+# Console status refresh rate (Hz); each print is a blocking console write
+DISPLAY_RATE = 10
+DISPLAY_INTERVAL_NS = int(1e9 / DISPLAY_RATE)
+
+# Controller sampling cap (Hz), independent of the MQTT update rate
+POLL_RATE = 250
+POLL_INTERVAL = 1.0 / POLL_RATE
+
+# Idle backoff: with no tilt button held, the poller's fallback timeout (a resample in
+# case the controller sends no event) doubles every IDLE_BACKOFF_TICKS unchanged samples,
+# up to UPDATE_INTERVAL << IDLE_BACKOFF_MAX_SHIFT. Controller events still wake it at once.
+IDLE_BACKOFF_TICKS = 10
+IDLE_BACKOFF_MAX_SHIFT = 3
+
+# Longest single sleep of the idle main loop, so Ctrl+C is still noticed on Windows
+MAX_IDLE_WAIT = 0.5
+
+# Publish batching: changed snapshots are coalesced and the newest one is flushed
+BATCH_WINDOW = 0.1       # Flush at least every 100 ms while snapshots are pending
+BATCH_WINDOW_NS = int(BATCH_WINDOW * 1e9)
+BATCH_SIGNIFICANT_DELTA = 20  # Flush immediately on a jump this big (motor/servo units)
 
 # ===== LOGGING SETUP =====
 logging.basicConfig(
@@ -69,6 +125,13 @@ def on_mqtt_connect(client, userdata, flags, rc):
     global mqtt_connected
     if rc == 0:
         logger.info("✅ Connected to MQTT broker")
+        
+        # Disable Nagle so each small command leaves immediately instead of waiting for an ACK
+        try:
+            client.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (AttributeError, OSError) as e:
+            logger.warning(f"⚠️ Could not set TCP_NODELAY: {e}")
+        
         mqtt_connected = True
     else:
         logger.error(f"❌ MQTT connection failed with code: {rc}")
@@ -79,17 +142,76 @@ def on_mqtt_disconnect(client, userdata, rc):
     logger.warning(f"⚠️ Disconnected from MQTT broker (code: {rc})")
     mqtt_connected = False
 
+class BotMqttClient(mqtt.Client):
+    """paho client with a fast path for QoS 0 commands on a fixed topic"""
+    
+    def __init__(self, command_topic, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Topic part of the PUBLISH variable header never changes (MQTT 3.1.1 framing)
+        topic = command_topic.encode("utf-8")
+        self._command_topic_header = struct.pack("!H", len(topic)) + topic
+        
+        # Last queued command and the outgoing queue it went into (reconnects replace the queue)
+        self._command_info = None
+        self._command_queue = None
+    
+    def command_backlogged(self):
+        """Check if the previous command is still waiting to be written to the socket"""
+        return (self._command_info is not None
+                and not self._command_info.is_published()
+                and self._command_queue is self._out_packet)
+    
+    def publish_command(self, payload):
+        """Queue payload as one prebuilt QoS 0 PUBLISH frame for the network thread"""
+        info = mqtt.MQTTMessageInfo(0)
+        if self._sock is None:
+            info.rc = mqtt.MQTT_ERR_NO_CONN
+            return info
+        
+        # Newest state wins: never stack a second command behind an unsent one
+        if self.command_backlogged():
+            info.rc = mqtt.MQTT_ERR_QUEUE_SIZE
+            return info
+        
+        # Remaining length uses MQTT's variable-length encoding (7 bits per byte)
+        remaining = len(self._command_topic_header) + len(payload)
+        length = bytearray()
+        while True:
+            byte = remaining & 0x7F
+            remaining >>= 7
+            if remaining:
+                length.append(byte | 0x80)
+            else:
+                length.append(byte)
+                break
+        
+        packet = b"".join((b"\x30", length, self._command_topic_header, payload))
+        # Hand the frame to paho's outgoing queue rather than the socket, so it can't
+        # interleave with a packet the network thread is writing
+        self._command_info = info
+        self._command_queue = self._out_packet
+        info.rc = self._packet_queue(mqtt.PUBLISH, packet, 0, 0, info)
+        return info
+
+def check_paho_version():
+    """Refuse to run outside paho-mqtt 1.6.x-1.x, the range BotMqttClient and force_stop support"""
+    version = tuple(int(part) for part in mqtt_package.__version__.split(".")[:2])
+    if not (1, 6) <= version < (2, 0):
+        logger.error(f"❌ paho-mqtt {mqtt_package.__version__} is not supported. Install it with: pip install \"paho-mqtt>=1.6,<2\"")
+        return False
+    return True
+
 def setup_mqtt():
     """Initialize MQTT connection"""
     global mqtt_client
     
-    mqtt_client = mqtt.Client(client_id=f"PS5_BotController_{int(time.time())}")
+    mqtt_client = BotMqttClient(MQTT_TOPIC, client_id=MQTT_CLIENT_ID, clean_session=True)
     mqtt_client.on_connect = on_mqtt_connect
     mqtt_client.on_disconnect = on_mqtt_disconnect
     
     try:
         logger.info(f"Connecting to MQTT broker: {MQTT_BROKER}:{MQTT_PORT}")
-        mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
+        mqtt_client.connect(MQTT_BROKER, MQTT_PORT, MQTT_KEEPALIVE)
         mqtt_client.loop_start()
         
         # Wait for connection
@@ -108,6 +230,76 @@ def setup_mqtt():
         logger.error(f"MQTT setup error: {e}")
         return False
 
+# ===== CONTROLLER INPUT =====
+# pydualsense events fired when an input used by BotController changes
+CONTROLLER_INPUT_EVENTS = (
+    "left_joystick_changed",
+    "right_joystick_changed",
+    "l1_changed",
+    "r1_changed",
+    "dpad_left",
+    "dpad_right",
+    "triangle_pressed",
+    "circle_pressed",
+    "cross_pressed",
+    "square_pressed",
+    "option_pressed",
+)
+
+def watch_controller_input(ds):
+    """Return an Event that is set whenever the controller reports new input"""
+    input_changed = threading.Event()
+    
+    def on_input(*args):
+        input_changed.set()
+    
+    for name in CONTROLLER_INPUT_EVENTS:
+        getattr(ds, name).subscribe(on_input)
+    
+    return input_changed
+
+# ===== DRIVE MATH =====
+S2_MID = (S2_MIN + S2_MAX) / 2
+S2_RANGE = (S2_MAX - S2_MIN) / 2
+
+# Explicit signatures compile at import time, so the control loop never waits on the JIT
+@njit("int64(float64, float64)", cache=True, fastmath=True)
+def stick_to_motor(stick_value, speed_mode):
+    """Map stick value (-1 to 1) to signed motor speed (-255 to 255)"""
+    # Apply deadzone
+    abs_value = abs(stick_value)
+    if abs_value < STICK_DEADZONE:
+        return 0
+    
+    # Rescale past the deadzone, apply speed mode and map to motor range
+    speed = (abs_value - STICK_DEADZONE) * STICK_DEADZONE_SCALE * speed_mode * MOTOR_MAX
+    if speed > MOTOR_MAX:
+        speed = MOTOR_MAX
+    speed = int(speed)
+    return speed if stick_value > 0 else -speed
+
+@njit("UniTuple(int64, 3)(float64, float64, float64, float64)", cache=True, fastmath=True)
+def compute_drive(left_y, right_x, right_y, speed_mode):
+    """Map stick axes (-1 to 1) to (L, R, S2) in a single pass"""
+    # Differential steering, clamped to 0..MOTOR_MAX
+    # Negative values stop the motor (or implement reverse logic)
+    forward_speed = stick_to_motor(left_y, speed_mode)
+    turn_speed = stick_to_motor(right_x, speed_mode)
+    left = forward_speed + turn_speed
+    right = forward_speed - turn_speed
+    left = 0 if left < 0 else MOTOR_MAX if left > MOTOR_MAX else left
+    right = 0 if right < 0 else MOTOR_MAX if right > MOTOR_MAX else right
+    
+    # Servo S2: deadzone, then map around the center of its range
+    abs_y = abs(right_y)
+    if abs_y < SERVO_DEADZONE:
+        angle = S2_MID
+    else:
+        angle = S2_MID + math.copysign((abs_y - SERVO_DEADZONE) * SERVO_DEADZONE_SCALE, right_y) * S2_RANGE
+        angle = S2_MIN if angle < S2_MIN else S2_MAX if angle > S2_MAX else angle
+    
+    return left, right, int(angle)
+
 # ===== BOT CONTROL CLASS =====
 class BotController:
     def __init__(self):
@@ -116,146 +308,251 @@ class BotController:
         self.S1 = 90  # Servo 1 (head tilt) - center
         self.S2 = 55  # Servo 2 (head up/down) - center
         self.speed_mode = MODE_NORMAL
-        self.last_command = {}
-        self.last_update_time = 0
         
-    def clamp(self, value, min_val, max_val):
-        """Clamp value between min and max"""
-        return max(min_val, min(max_val, value))
-    
-    def apply_deadzone(self, value, deadzone=STICK_DEADZONE):
-        """Apply deadzone to controller input"""
-        if abs(value) < deadzone:
-            return 0.0
-        # Scale the remaining range
-        sign = 1 if value > 0 else -1
-        return sign * (abs(value) - deadzone) / (1.0 - deadzone)
-    
-    def map_stick_to_motor(self, stick_value):
-        """Map stick value (-1 to 1) to motor speed (0 to 255)"""
-        # Apply deadzone
-        stick_value = self.apply_deadzone(stick_value)
-        
-        # Apply speed mode
-        stick_value *= self.speed_mode
-        
-        # Map to motor range
-        if stick_value > 0:
-            return int(self.clamp(stick_value * MOTOR_MAX, 0, MOTOR_MAX))
-        elif stick_value < 0:
-            return -int(self.clamp(abs(stick_value) * MOTOR_MAX, 0, MOTOR_MAX))
-        return 0
-    
-    def map_stick_to_servo(self, stick_value, min_val, max_val):
-        """Map stick value (-1 to 1) to servo angle"""
-        # Apply deadzone
-        stick_value = self.apply_deadzone(stick_value, deadzone=0.1)
+        # Latest controller state, written by the polling thread and read by the publisher
+        self._lock = threading.Lock()
+        self._latest = (self.L, self.R, self.S1, self.S2)
+        self._latest_mode = self.speed_mode
+        self._poller = None
+        self._input_changed = None
+        self._idle_ticks = 0
+        self._s1_held = False
+        self._next_s1_step_ns = 0
+        self.stopped = threading.Event()
+        self.wake = threading.Event()  # Set when the publisher has new state to handle
         
-        # Map to servo range
-        mid_val = (min_val + max_val) / 2
-        range_val = (max_val - min_val) / 2
+        # Payload template: only the (L, R, S1, S2) fields change between commands
+        self._tmpl = ('{"password":' + json.dumps(BOT_PASSWORD).replace("%", "%%") +
+                      ',"L":%d,"R":%d,"S1":%d,"S2":%d}').encode()
+        
+        # Bound once: mqtt_client is connected before the bot controller is created
+        self._publish = mqtt_client.publish_command
+        
+        self._last_tuple = None  # Last (L, R, S1, S2) snapshot queued for sending
+        self.last_sent = None  # Last snapshot actually published
+        self.pending = None  # Newest snapshot waiting for the batch window
+        self.first_pending_ns = 0
+        self._next_deadline_ns = 0
+        self._next_display_ns = 0
+        self._display_pending = False
         
-        angle = mid_val + (stick_value * range_val)
-        return int(self.clamp(angle, min_val, max_val))
-    
     def update_from_controller(self, ds):
-        """Update bot state from PS5 controller"""
-        # Get controller state
+        """Update bot state from PS5 controller, returning True if it changed"""
+        # Read every input once up front: locals are cheaper than repeated attribute
+        # lookups, and pydualsense's reader thread can't change values mid-update
         state = ds.state
+        ly, rx, ry = state.LY, state.RX, state.RY
+        l1, r1, dpad_left, dpad_right = state.L1, state.R1, state.DpadLeft, state.DpadRight
+        triangle, circle, cross, square = state.triangle, state.circle, state.cross, state.square
         
-        # ===== MOTOR CONTROL =====
+        # ===== MOTOR & SERVO S2 CONTROL =====
         # Left stick Y-axis: Forward/Backward (inverted: up=-1, down=+1)
-        left_y = -state.LY  # Invert so up is positive
-        
         # Right stick X-axis: Turning
-        right_x = state.RX
-        
-        # Calculate differential drive
-        forward_speed = self.map_stick_to_motor(left_y)
-        turn_speed = self.map_stick_to_motor(right_x)
-        
-        # Differential steering
-        self.L = self.clamp(forward_speed + turn_speed, -MOTOR_MAX, MOTOR_MAX)
-        self.R = self.clamp(forward_speed - turn_speed, -MOTOR_MAX, MOTOR_MAX)
-        
-        # Handle negative values (reverse direction)
-        if self.L < 0:
-            self.L = 0  # Stop if reverse (or implement reverse logic)
-        if self.R < 0:
-            self.R = 0
-        
-        # ===== SERVO CONTROL =====
-        # Right stick Y-axis: Servo S2 (head up/down)
-        right_y = -state.RY  # Invert: up = look up
-        self.S2 = self.map_stick_to_servo(right_y, S2_MIN, S2_MAX)
+        # Right stick Y-axis: Servo S2 (head up/down, inverted: up = look up)
+        left, right, s2 = compute_drive(-ly, rx, -ry, self.speed_mode)
         
+        # ===== SERVO S1 CONTROL =====
         # L1/R1 or D-pad: Servo S1 (head tilt)
-        if state.L1:  # Tilt head left
-            self.S1 = max(S1_MIN, self.S1 - 5)
-        elif state.R1:  # Tilt head right
-            self.S1 = min(S1_MAX, self.S1 + 5)
-        elif state.DpadLeft:
-            self.S1 = max(S1_MIN, self.S1 - 10)
-        elif state.DpadRight:
-            self.S1 = min(S1_MAX, self.S1 + 10)
+        s1 = self.S1
+        delta = S1_DELTA_TABLE[l1 | r1 << 1 | dpad_left << 2 | dpad_right << 3]
+        if delta:
+            # First step on press, then one per elapsed repeat interval
+            now = time.monotonic_ns()
+            if not self._s1_held:
+                steps = 1
+                self._next_s1_step_ns = now + S1_REPEAT_INTERVAL_NS
+            elif now >= self._next_s1_step_ns:
+                steps = 1 + (now - self._next_s1_step_ns) // S1_REPEAT_INTERVAL_NS
+                self._next_s1_step_ns += steps * S1_REPEAT_INTERVAL_NS
+            else:
+                steps = 0
+            s1 += delta * steps
+            s1 = S1_MIN if s1 < S1_MIN else S1_MAX if s1 > S1_MAX else s1
+        self._s1_held = delta != 0
         
         # ===== BUTTON ACTIONS =====
         # Triangle: Center servos
-        if state.triangle:
-            self.S1 = 90
-            self.S2 = 55
+        if triangle:
+            s1 = 90
+            s2 = 55
             logger.info("🎯 Servos centered")
         
         # Circle: Stop all motors
-        if state.circle:
-            self.L = 0
-            self.R = 0
+        if circle:
+            left = 0
+            right = 0
             logger.info("🛑 Motors stopped")
         
+        self.L, self.R, self.S1, self.S2 = left, right, s1, s2
+        
         # Cross (X): Turbo mode
-        if state.cross:
+        if cross:
             self.speed_mode = MODE_TURBO
         # Square: Slow mode
-        elif state.square:
+        elif square:
             self.speed_mode = MODE_SLOW
         else:
             self.speed_mode = MODE_NORMAL
+        
+        return self.store_state()
+    
+    def store_state(self):
+        """Copy current state into the latest-state slot read by send_mqtt_command"""
+        # compute_drive and the S1 steps already produce ints, so no coercion is needed
+        state = (self.L, self.R, self.S1, self.S2)
+        with self._lock:
+            changed = state != self._latest or self.speed_mode != self._latest_mode
+            self._latest = state
+            self._latest_mode = self.speed_mode
+        if changed:
+            self.wake.set()
+        return changed
+    
+    def start_polling(self, ds):
+        """Start sampling the controller on a background thread"""
+        self._input_changed = watch_controller_input(ds)
+        self._poller = threading.Thread(target=self._poll_controller, args=(ds,), daemon=True)
+        self._poller.start()
+    
+    def stop_polling(self):
+        """Stop the polling thread and wait for it to exit"""
+        self.stopped.set()
+        if self._input_changed is not None:
+            self._input_changed.set()  # Cut short an idle backoff wait
+        if self._poller is not None:
+            self._poller.join()
+    
+    def _poll_controller(self, ds):
+        """Sample the controller on input changes, capped at POLL_RATE"""
+        input_changed = self._input_changed
+        next_sample = 0
+        
+        try:
+            while not self.stopped.is_set():
+                # A held tilt button samples at the fixed S1 repeat rate; otherwise the
+                # timeout is only a fallback resample in case no event arrives, and it
+                # backs off while samples keep coming back unchanged
+                if self._s1_held:
+                    # Sample at the S1 repeat rate so a held tilt moves smoothly
+                    timeout = S1_REPEAT_INTERVAL_NS / 1e9
+                else:
+                    shift = min(self._idle_ticks // IDLE_BACKOFF_TICKS, IDLE_BACKOFF_MAX_SHIFT)
+                    timeout = UPDATE_INTERVAL * (1 << shift)
+                input_changed.wait(timeout)
+                input_changed.clear()
+                
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_sample = time.monotonic() + POLL_INTERVAL
+                
+                if self.update_from_controller(ds):
+                    self._idle_ticks = 0
+                else:
+                    self._idle_ticks += 1
+                if ds.state.options:
+                    self.wake.set()  # Let the main loop see the exit button
+        
+        except Exception as e:
+            logger.error(f"\n\n❌ Controller polling error: {e}")
+            self.stopped.set()
+            self.wake.set()
+    
+    def force_stop(self):
+        """Stop polling and deliver a motor stop command, waiting for the broker to confirm"""
+        self.stop_polling()
+        self.L = 0
+        self.R = 0
+        self.store_state()
+        
+        if not mqtt_connected:
+            logger.warning("⚠️ MQTT not connected, cannot send motor stop")
+            return False
+        
+        # QoS 1 so shutdown doesn't rely on a fire-and-forget packet; it queues behind
+        # any command still unsent, so the stop is always the last state the bot sees
+        command = (self.L, self.R, self.S1, self.S2)
+        try:
+            result = mqtt_client.publish(MQTT_TOPIC, self._tmpl % command, qos=1)
+            result.wait_for_publish(timeout=1.0)
+            
+            if result.is_published():
+                self.last_sent = command
+                logger.info("🛑 Motor stop delivered")
+                return True
+            else:
+                logger.warning("⚠️ Motor stop not confirmed by broker")
+                return False
+        
+        except Exception as e:
+            logger.error(f"❌ Error sending motor stop: {e}")
+            return False
     
     def send_mqtt_command(self):
         """Send current bot state to MQTT"""
+        # Check update rate limit
+        now = time.monotonic_ns()
+        if now < self._next_deadline_ns:
+            return False
+        self._next_deadline_ns = now + UPDATE_INTERVAL_NS
+        
         if not mqtt_connected:
             logger.warning("⚠️ MQTT not connected, skipping command")
             return False
         
-        # Check update rate limit
-        current_time = time.time()
-        if current_time - self.last_update_time < UPDATE_INTERVAL:
+        self.wake.clear()
+        with self._lock:
+            state = self._latest
+        
+        # Only queue if changed
+        if state == self._last_tuple:
+            return self.flush_pending(now)
+        
+        self._last_tuple = state
+        if self.pending is None:
+            self.first_pending_ns = now
+        self.pending = state
+        
+        return self.flush_pending(now, force=self.is_significant(state))
+    
+    def is_significant(self, command):
+        """Check if a snapshot differs enough from the last publish to skip batching"""
+        if self.last_sent is None:
+            return True
+        # Stopping the motors must never wait for the batch window
+        if command[0] == 0 and command[1] == 0 and (self.last_sent[0] or self.last_sent[1]):
+            return True
+        return any(abs(new - old) >= BATCH_SIGNIFICANT_DELTA
+                   for new, old in zip(command, self.last_sent))
+    
+    def flush_pending(self, now, force=False):
+        """Publish the pending snapshot once the batch window has passed"""
+        if self.pending is None:
             return False
-        self.last_update_time = current_time
-        
-        # Build command
-        command = {
-            "password": BOT_PASSWORD,
-            "L": int(self.L),
-            "R": int(self.R),
-            "S1": int(self.S1),
-            "S2": int(self.S2)
-        }
-        
-        # Only send if changed
-        if command == self.last_command:
+        
+        if not force and now - self.first_pending_ns < BATCH_WINDOW_NS:
             return False
         
-        self.last_command = command.copy()
+        # The bot only acts on the newest state, so the batch collapses into one payload
+        command = self.pending
+        self.pending = None
         
         # Send to MQTT
         try:
-            payload = json.dumps(command)
-            result = mqtt_client.publish(MQTT_TOPIC, payload, qos=0)
+            payload = self._tmpl % command
+            result = self._publish(payload)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.debug(f"📡 Sent: L={self.L} R={self.R} S1={self.S1} S2={self.S2}")
+                self.last_sent = command
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"📡 Sent: L={command[0]} R={command[1]} S1={command[2]} S2={command[3]}")
                 return True
+            elif result.rc == mqtt.MQTT_ERR_QUEUE_SIZE:
+                # Socket is backed up: keep only this newest state and retry on the next tick
+                self.pending = command
+                self.first_pending_ns = now - BATCH_WINDOW_NS
+                logger.debug("⏳ MQTT send queue busy, holding latest command")
+                return False
             else:
                 logger.warning(f"⚠️ MQTT publish failed: {result.rc}")
                 return False
@@ -265,11 +562,41 @@ class BotController:
             return False
     
     def display_status(self):
-        """Display current status on console"""
+        """Display current status on console, at most DISPLAY_RATE times per second"""
+        now = time.monotonic_ns()
+        if now < self._next_display_ns:
+            self._display_pending = True
+            return
+        self._next_display_ns = now + DISPLAY_INTERVAL_NS
+        self._display_pending = False
+        
         mode_str = "🚀 TURBO" if self.speed_mode == MODE_TURBO else "🐢 SLOW" if self.speed_mode == MODE_SLOW else "⚙️ NORMAL"
         
         print(f"\r{mode_str} | Motors: L={self.L:3d} R={self.R:3d} | Servos: S1={self.S1:3d}° S2={self.S2:3d}°", end="", flush=True)
 
+    def wait_for_work(self):
+        """Sleep until new input or the next batch or display deadline"""
+        now = time.monotonic_ns()
+        next_wake = now + int(MAX_IDLE_WAIT * 1e9)
+        if self.pending is not None:
+            next_wake = min(next_wake, self.first_pending_ns + BATCH_WINDOW_NS)
+        if self._display_pending:
+            next_wake = min(next_wake, self._next_display_ns)
+        
+        if self.wake.is_set():
+            # New state is already waiting, only the rate limit holds it back
+            next_wake = self._next_deadline_ns
+        
+        # Nothing can be sent before the rate-limit deadline, so never wake earlier;
+        # this also keeps failed or backlogged sends from spinning the loop
+        next_wake = max(next_wake, self._next_deadline_ns)
+        timeout = max(0, next_wake - now) / 1e9
+        
+        if self.wake.is_set():
+            self.stopped.wait(timeout)
+        else:
+            self.wake.wait(timeout)
+
 # ===== MAIN PROGRAM =====
 def main():
     logger.info("=" * 60)
@@ -277,6 +604,8 @@ def main():
     logger.info("=" * 60)
     
     # Setup MQTT
+    if not check_paho_version():
+        return
     if not setup_mqtt():
         logger.error("Failed to connect to MQTT broker. Exiting.")
         return
@@ -313,10 +642,10 @@ def main():
     logger.info("\nController active! Press Options to exit.\n")
     
     try:
-        while True:
-            # Read controller state
-            bot.update_from_controller(ds)
-            
+        # Read controller state on a background thread
+        bot.start_polling(ds)
+        
+        while not bot.stopped.is_set():
             # Send to MQTT
             bot.send_mqtt_command()
             
@@ -326,26 +655,12 @@ def main():
             # Check for exit button (Options button)
             if ds.state.options:
                 logger.info("\n\n🛑 Options button pressed. Exiting...")
-                
-                # Stop motors before exit
-                bot.L = 0
-                bot.R = 0
-                bot.send_mqtt_command()
-                time.sleep(0.2)
-                
                 break
             
-            # Small delay to prevent CPU overload
-            time.sleep(0.01)
+            bot.wait_for_work()
     
     except KeyboardInterrupt:
         logger.info("\n\n⚠️ Ctrl+C pressed. Stopping bot...")
-        
-        # Stop motors before exit
-        bot.L = 0
-        bot.R = 0
-        bot.send_mqtt_command()
-        time.sleep(0.2)
     
     except Exception as e:
         logger.error(f"\n\n❌ Error: {e}")
@@ -356,10 +671,8 @@ def main():
         # Cleanup
         logger.info("Cleaning up...")
         
-        # Stop motors
-        bot.L = 0
-        bot.R = 0
-        bot.send_mqtt_command()
+        # Stop motors (single confirmed publish)
+        bot.force_stop()
         
         # Close controller
         try: